@@ -8,14 +8,13 @@ from pathlib import Path
 import os
 import stat
 import subprocess
+import time
 
 from mcp import ClientSession, StdioServerParameters # Assuming mcp library is correct
 from mcp.client.stdio import stdio_client
 
 # New Imports for Robustness and Local Time
 import socket
-from urllib.request import urlopen
-from urllib.error import URLError, HTTPError
 from datetime import datetime
 from zoneinfo import ZoneInfo
 
@@ -27,7 +26,19 @@ from zoneinfo import ZoneInfo
 DEFAULT_TIMEZONE = os.environ.get("MCP_DEFAULT_TIMEZONE", "Australia/Melbourne")
 API_TIMEOUT = 5 # Timeout for any remaining external calls (5 seconds is reasonable)
 
+# Rapid successive queries reuse the formatted string instead of rebuilding it
+TIME_CACHE_TTL_SECONDS = 1.0
+_TIME_CACHE = {"ts": float("-inf"), "val": ""}
+
 def get_current_time() -> str:
+    now_ts = time.monotonic()
+    if now_ts - _TIME_CACHE["ts"] < TIME_CACHE_TTL_SECONDS:
+        return _TIME_CACHE["val"]
+    _TIME_CACHE["val"] = _format_current_time()
+    _TIME_CACHE["ts"] = now_ts
+    return _TIME_CACHE["val"]
+
+def _format_current_time() -> str:
     try:
         tz = ZoneInfo(DEFAULT_TIMEZONE)
         now = datetime.now(tz)
@@ -54,6 +65,11 @@ if not SCRIPT_ALLOWLIST_DIR.exists():
         # Best-effort; some filesystems/OS won't support chmod the same way
         pass
 
+# How long Ollama keeps the model resident after the warm-up and each query.
+# Server-side, OLLAMA_NUM_PARALLEL and OLLAMA_MAX_LOADED_MODELS control how many
+# requests/models the Ollama daemon serves concurrently.
+OLLAMA_KEEP_ALIVE = os.environ.get("MCP_OLLAMA_KEEP_ALIVE", "30m")
+
 TOOL_ALLOWLIST: List[str] = [
     "get_current_time",
     # Add other safe, read-only tools here.
@@ -64,6 +80,7 @@ class MCPClient:
         self.session: Optional[ClientSession] = None
         self.exit_stack = AsyncExitStack()
         self.ollama_model = os.environ.get("MCP_DEFAULT_OLLAMA_MODEL", "llama3:8b-instruct")
+        self._ollama = ollama.AsyncClient()
 
     def _validate_and_resolve_script(self, server_script_path: str) -> Path:
         """
@@ -79,13 +96,9 @@ class MCPClient:
             # Do not allow non-existent scripts to be executed
             raise ValueError("Server script does not exist or is not accessible")
 
-        try:
-            allowed_dir = SCRIPT_ALLOWLIST_DIR
-            allowed_dir = allowed_dir.resolve(strict=True)
-        except FileNotFoundError:
-            raise RuntimeError("Configured script allowlist directory is missing")
-
-        if not str(resolved).startswith(str(allowed_dir) + os.sep):
+        # SCRIPT_ALLOWLIST_DIR is resolved once at import; a script that exists
+        # can only be relative to it if the directory still exists too.
+        if not resolved.is_relative_to(SCRIPT_ALLOWLIST_DIR):
             raise ValueError("Server script is not inside the allowed scripts directory")
 
         if not resolved.is_file():
@@ -121,4 +134,15 @@ class MCPClient:
         stdio_transport = await self.exit_stack.enter_async_context(stdio_client(server_params))
         self.stdio, self.write = stdio_transport
 
+        await self._warm_up_model()
+
+    async def _warm_up_model(self):
+        """Load the Ollama model now so the first query doesn't pay the load time"""
+        try:
+            # An empty message list loads the model without generating anything
+            await self._ollama.chat(model=self.ollama_model, messages=[], keep_alive=OLLAMA_KEEP_ALIVE)
+        except Exception as e:
+            # Best-effort; the first query will load the model instead
+            print(f"Warning: could not warm up Ollama model '{self.ollama_model}': {e}")
+
     # ... rest of client implementation ...
@@ -1,14 +1,39 @@
 from pathlib import Path
 from typing import Optional, Any
+import errno
 import os
 import shutil
+import stat
+import time
 from datetime import datetime
+from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
 from contextlib import asynccontextmanager
 from collections.abc import AsyncIterator
 
 from mcp.server.fastmcp import FastMCP, Image
 from mcp.server.fastmcp.prompts import base # Only base is imported, Context removed as unused
 
+# Optional preview dependencies (python-magic, Pillow). The magic database is
+# loaded once here instead of on every get_file_preview call.
+try:
+    import magic
+    _MIME = magic.Magic(mime=True)
+except Exception:
+    # Not installed, or libmagic/its database is unavailable
+    _MIME = None
+
+try:
+    from PIL import Image as PILImage
+except ImportError:
+    PILImage = None
+
+try:
+    import fcntl  # POSIX only; used for reflink copies
+except ImportError:
+    fcntl = None
+
 # ------------------------------------------------------------------
 # 🛡️ CRITICAL SECURITY CONFIGURATION & HELPER
 # ------------------------------------------------------------------
@@ -25,33 +50,171 @@ if not BASE_DIR.exists():
     print(f"Created secure workspace directory at: {BASE_DIR}")
 
 
+# Chunk size used when streaming file contents through os.read()
+READ_CHUNK_SIZE = 1 << 20  # 1MB
+
+# Raw descriptors default to CRT text mode on Windows (CRLF translation, 0x1A
+# read as end-of-file); O_BINARY keeps os.read()/os.write() byte-exact there
+_O_BINARY = getattr(os, "O_BINARY", 0)
+
+# Bounding box for get_file_preview thumbnails
+PREVIEW_SIZE = (300, 300)
+
+# Image modes the PNG encoder accepts as-is; previews in other modes are converted
+PNG_MODES = {'1', 'L', 'LA', 'P', 'RGB', 'RGBA', 'I', 'I;16'}
+
+# Detailed listings of directories larger than this stat their entries on the
+# I/O pool, which bulk_read also uses. File syscalls release the GIL, so on slow
+# (e.g. network) filesystems they overlap instead of running back to back.
+STAT_POOL_THRESHOLD = 32
+_IO_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="fs-io")
+
+# Bulk tools keep at most this many operations submitted at once; flooding the
+# pool (or a network filesystem) with a whole batch only adds contention
+BULK_MAX_IN_FLIGHT = 16
+
+
 class PermissionError(Exception):
     """Custom exception for file access violations."""
     pass
 
-def resolve_and_check_path(path_input: str, follow_symlinks: bool = True) -> Path:
+def resolve_and_check_path(path_input: str) -> Path:
     """
     Validates that the resolved path is strictly within the BASE_DIR.
     This prevents Path Traversal (CWE-22) and Absolute Path attacks.
     """
-    # 1. Join the base path and the user input
+    # 1. Join the base path and the user input. BASE_DIR is absolute, so "~"
+    # would never be expanded here; reject it rather than treat it as a folder.
+    if path_input.startswith("~"):
+        raise PermissionError("Access denied: '~' paths are not supported inside the workspace")
     unsafe_full_path = BASE_DIR / path_input
     
     # 2. Resolve/Normalize: This removes '..', '//', and resolves symlinks
-    # Using resolve() is critical for canonicalization.
-    try:
-        resolved_path = unsafe_full_path.expanduser().resolve(strict=follow_symlinks)
-    except FileNotFoundError:
-        # Allow non-existent paths (like for create_file) to be checked
-        resolved_path = unsafe_full_path.expanduser().resolve(strict=False)
-
-    # 3. Validate: Check if the resolved path starts with the secure BASE_DIR path string
-    # String comparison is needed to ensure the path doesn't escape the boundary.
-    if not str(resolved_path).startswith(str(BASE_DIR)):
+    # Using resolve() is critical for canonicalization. A single non-strict pass
+    # resolves every existing component and still allows non-existent targets
+    # (like for create_file) to be checked. It runs on every call: a cached
+    # result would miss symlinks created since, and check a stale path.
+    resolved_path = unsafe_full_path.resolve()
+
+    # 3. Validate: Check that the resolved path lies under BASE_DIR.
+    # Comparing path parts (not string prefixes) keeps a sibling such as
+    # "/tmp/mcp_workspace_evil" from passing as "/tmp/mcp_workspace".
+    if not resolved_path.is_relative_to(BASE_DIR):
         raise PermissionError(f"Access denied: Operation is outside the authorized workspace: {BASE_DIR}")
     
     return resolved_path
 
+def _write_all(fd: int, data: bytes) -> int:
+    """Write all of data to fd, looping over short writes. Returns bytes written."""
+    view = memoryview(data)
+    while view:
+        written = os.write(fd, view)
+        view = view[written:]
+    return len(data)
+
+# Errors from os.copy_file_range that mean "not supported here", not "copy failed"
+_COPY_FALLBACK_ERRNOS = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.EBADF}
+
+# Linux ioctl that clones a whole file's extents (Btrfs, XFS with reflink=1, ...)
+FICLONE = 0x40049409
+
+def _try_reflink(src_fd: int, dst_fd: int) -> bool:
+    """Share src's data blocks with dst copy-on-write. Returns False if unsupported."""
+    if fcntl is None:
+        return False
+    try:
+        fcntl.ioctl(dst_fd, FICLONE, src_fd)
+    except OSError:
+        # EOPNOTSUPP/ENOTTY/EXDEV/EINVAL: filesystem or mount can't clone
+        return False
+    return True
+
+def _fast_copy(src: str, dst: str) -> str:
+    """
+    Copy a file like shutil.copy2, but clone it copy-on-write where the
+    filesystem supports reflinks, or else move the data in-kernel with
+    os.copy_file_range (Linux) instead of through a user-space buffer.
+    Falls back to shutil.copy2 where neither is supported. The signature
+    matches shutil's copy_function so copytree can use it per file.
+    """
+    if os.path.isdir(dst):
+        dst = os.path.join(dst, os.path.basename(src))
+    if os.path.exists(dst) and os.path.samefile(src, dst):
+        raise shutil.SameFileError(f"{src!r} and {dst!r} are the same file")
+
+    size = os.stat(src).st_size
+    # Size 0 may also mean a pseudo-file whose length isn't known up front
+    if not hasattr(os, "copy_file_range") or size == 0:
+        return shutil.copy2(src, dst)
+
+    try:
+        with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+            remaining = 0 if _try_reflink(fsrc.fileno(), fdst.fileno()) else size
+            while remaining > 0:
+                copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                if copied == 0:
+                    if remaining == size:
+                        # Nothing copied at all; files such as procfs entries report
+                        # a size but copy_file_range returns 0 for them
+                        raise OSError(errno.EINVAL, "copy_file_range copied nothing")
+                    break
+                remaining -= copied
+    except OSError as e:
+        if e.errno not in _COPY_FALLBACK_ERRNOS:
+            raise
+        return shutil.copy2(src, dst)
+
+    shutil.copystat(src, dst)
+    return dst
+
+def _lstat_entry(entry: os.DirEntry) -> os.stat_result:
+    return entry.stat(follow_symlinks=False)
+
+def _map_bounded(fn, items):
+    """
+    Like _IO_POOL.map, but with a sliding window of at most BULK_MAX_IN_FLIGHT
+    submitted calls: a new one is submitted as the oldest completes.
+    Results are yielded in input order.
+    """
+    in_flight = deque()
+    for item in items:
+        in_flight.append(_IO_POOL.submit(fn, item))
+        if len(in_flight) >= BULK_MAX_IN_FLIGHT:
+            yield in_flight.popleft().result()
+    while in_flight:
+        yield in_flight.popleft().result()
+
+# ------------------------------------------------------------------
+# METADATA FORMATTING
+# ------------------------------------------------------------------
+
+def _format_timestamp(ts: float) -> str:
+    # One C-level strftime call instead of building a datetime object
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(ts))
+
+def _format_file_info(path: str, size: int, mtime: float, ctime: float) -> str:
+    return "\n".join((
+        f"File (Workspace Relative): {path}",
+        f"Size: {size} bytes",
+        f"Last modified: {_format_timestamp(mtime)}",
+        f"Created: {_format_timestamp(ctime)}",
+    ))
+
+def _entry_type(mode: int) -> str:
+    # Entries are lstat'ed, so a symlink is reported as one rather than as
+    # whatever it points to
+    if stat.S_ISLNK(mode):
+        return "Symlink"
+    return "Directory" if stat.S_ISDIR(mode) else "File"
+
+def _format_entry_details(name: str, entry_type: str, size: int, mtime: float) -> str:
+    return "\n".join((
+        name,
+        f"  Type: {entry_type}",
+        f"  Size: {size} bytes",
+        f"  Modified: {_format_timestamp(mtime)}",
+    ))
+
 # ------------------------------------------------------------------
 # MCP SERVER SETUP
 # ------------------------------------------------------------------
@@ -87,16 +250,12 @@ def get_file_info(path: str) -> str:
         
         if file_path.is_dir():
             # Only list contents relative to the workspace, not the full path
-            contents = "\n".join(f.name for f in file_path.iterdir())
+            with os.scandir(file_path) as entries:
+                contents = "\n".join(entry.name for entry in entries)
             return f"Directory (Workspace Relative): {path}\nContents:\n{contents}"
         else:
             stats = file_path.stat()
-            return (
-                f"File (Workspace Relative): {path}\n"
-                f"Size: {stats.st_size} bytes\n"
-                f"Last modified: {datetime.fromtimestamp(stats.st_mtime)}\n"
-                f"Created: {datetime.fromtimestamp(stats.st_ctime)}"
-            )
+            return _format_file_info(path, stats.st_size, stats.st_mtime, stats.st_ctime)
     except PermissionError as e:
         return f"Access Denied Error: {e}"
     except Exception as e:
@@ -107,8 +266,8 @@ def get_file_info(path: str) -> str:
 def create_directory(path: str, parents: bool = False) -> str:
     """Create a new directory at the specified path"""
     try:
-        # 🔑 SECURE PATH CHECK - must not follow symlinks for creation
-        dir_path = resolve_and_check_path(path, follow_symlinks=False)
+        # 🔑 SECURE PATH CHECK
+        dir_path = resolve_and_check_path(path)
         dir_path.mkdir(parents=parents, exist_ok=True)
         return f"Directory created at {path} (in workspace)"
     except PermissionError as e:
@@ -121,15 +280,20 @@ def create_directory(path: str, parents: bool = False) -> str:
 def create_file(path: str, content: Optional[str] = None) -> str:
     """Create a new file at the specified path with optional content"""
     try:
-        # 🔑 SECURE PATH CHECK - must not follow symlinks for creation
-        file_path = resolve_and_check_path(path, follow_symlinks=False)
+        # 🔑 SECURE PATH CHECK
+        file_path = resolve_and_check_path(path)
         
-        file_path.touch()
+        if content is None:
+            file_path.touch()
+            return f"Empty file created at {path}"
         
-        if content is not None:
-            file_path.write_text(content)
-            return f"File created at {path} with {len(content)} bytes of content"
-        return f"Empty file created at {path}"
+        # Create and write through one descriptor instead of touch() + write_text()
+        fd = os.open(file_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | _O_BINARY, 0o644)
+        try:
+            written = _write_all(fd, content.encode("utf-8"))
+        finally:
+            os.close(fd)
+        return f"File created at {path} with {written} bytes of content"
     except PermissionError as e:
         return f"Access Denied Error: {e}"
     except Exception as e:
@@ -143,16 +307,19 @@ def write_file(path: str, content: str, append: bool = False) -> str:
         # 🔑 SECURE PATH CHECK
         file_path = resolve_and_check_path(path)
         
-        if not file_path.exists():
+        # No O_CREAT: opening a missing file fails, which replaces the exists() check
+        flags = os.O_WRONLY | _O_BINARY | (os.O_APPEND if append else os.O_TRUNC)
+        try:
+            fd = os.open(file_path, flags)
+        except FileNotFoundError:
             return f"Error: File does not exist at {path}"
-        
-        mode = "a" if append else "w"
-        # Using open() within a secure check is now safe
-        with file_path.open(mode) as f:
-            f.write(content)
+        try:
+            written = _write_all(fd, content.encode("utf-8"))
+        finally:
+            os.close(fd)
         
         action = "appended to" if append else "written to"
-        return f"Content {action} {path} ({len(content)} bytes)"
+        return f"Content {action} {path} ({written} bytes)"
     except PermissionError as e:
         return f"Access Denied Error: {e}"
     except Exception as e:
@@ -166,13 +333,30 @@ def read_file(path: str) -> str:
         # 🔑 SECURE PATH CHECK
         file_path = resolve_and_check_path(path)
         
-        if not file_path.exists():
+        # Try the open first and only stat on failure, instead of issuing
+        # exists()/is_dir() calls up front. How a directory fails varies: Linux
+        # opens it and fails the read with EISDIR, Windows fails the open with EACCES.
+        try:
+            fd = os.open(file_path, os.O_RDONLY | _O_BINARY)
+        except FileNotFoundError:
             return f"Error: File does not exist at {path}"
-        
-        if file_path.is_dir():
+        except OSError:
+            if file_path.is_dir():
+                return f"Error: {path} is a directory, not a file"
+            raise
+        try:
+            chunks = []
+            while True:
+                chunk = os.read(fd, READ_CHUNK_SIZE)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+        except IsADirectoryError:
             return f"Error: {path} is a directory, not a file"
+        finally:
+            os.close(fd)
         
-        return file_path.read_text()
+        return b"".join(chunks).decode("utf-8")
     except PermissionError as e:
         return f"Access Denied Error: {e}"
     except Exception as e:
@@ -192,20 +376,24 @@ def list_directory(path: str = ".", detailed: bool = False) -> str:
         if not dir_path.is_dir():
             return f"Error: {path} is not a directory"
         
-        items = []
-        for item in dir_path.iterdir():
-            item_relative_to_base = item.relative_to(BASE_DIR)
-            
-            if detailed:
-                stats = item.stat()
-                items.append(
-                    f"{item_relative_to_base.name}\n"
-                    f"  Type: {'Directory' if item.is_dir() else 'File'}\n"
-                    f"  Size: {stats.st_size} bytes\n"
-                    f"  Modified: {datetime.fromtimestamp(stats.st_mtime)}"
-                )
+        # os.scandir reuses the directory entry's type info, so the plain listing
+        # needs no stat() at all and the detailed one needs a single lstat per entry
+        with os.scandir(dir_path) as it:
+            entries = list(it)
+        
+        if detailed:
+            if len(entries) > STAT_POOL_THRESHOLD:
+                stats = _IO_POOL.map(_lstat_entry, entries)
             else:
-                items.append(item_relative_to_base.name)
+                stats = map(_lstat_entry, entries)
+            items = [
+                _format_entry_details(
+                    entry.name, _entry_type(st.st_mode), st.st_size, st.st_mtime
+                )
+                for entry, st in zip(entries, stats)
+            ]
+        else:
+            items = [entry.name for entry in entries]
         
         return f"Contents of {path} (in workspace):\n" + "\n".join(items)
     except PermissionError as e:
@@ -242,6 +430,23 @@ def delete_path(path: str, recursive: bool = False) -> str:
     except Exception as e:
         return f"Deletion failed: {e}"
 
+# Tool to read several files in one call
+@mcp.tool()
+def bulk_read(paths: list[str]) -> str:
+    """Read the contents of several files in one call"""
+    # Each read goes through read_file (same checks and errors); they run on the
+    # I/O pool so the file syscalls overlap. Output keeps the order of paths.
+    results = _map_bounded(read_file, paths)
+    return "\n".join(f"=== {path} ===\n{result}" for path, result in zip(paths, results))
+
+# Tool to delete several files or directories in one call
+@mcp.tool()
+def bulk_delete(paths: list[str], recursive: bool = False) -> str:
+    """Delete several files or directories in one call"""
+    # Deletes run in the given order so e.g. a file and then its parent
+    # directory can be removed in the same batch.
+    return "\n".join(delete_path(path, recursive) for path in paths)
+
 # Tool to move/rename a file or directory
 @mcp.tool()
 def move_path(source: str, destination: str) -> str:
@@ -275,9 +480,9 @@ def copy_path(source: str, destination: str) -> str:
             return f"Error: Source path does not exist at {source}"
         
         if src_path.is_dir():
-            shutil.copytree(str(src_path), str(dest_path))
+            shutil.copytree(str(src_path), str(dest_path), copy_function=_fast_copy)
         else:
-            shutil.copy2(str(src_path), str(dest_path))
+            _fast_copy(str(src_path), str(dest_path))
         
         return f"Copied {source} to {destination} (within workspace)"
     except PermissionError as e:
@@ -323,27 +528,34 @@ def change_directory(path: str) -> str:
 @mcp.tool()
 def get_file_preview(path: str) -> Optional[Image]:
     """Get a preview image of a file if possible"""
+    if _MIME is None or PILImage is None:
+        # If magic or PIL is not installed
+        return None
+
     try:
-        import magic
-        from PIL import Image as PILImage
-        
         # 🔑 SECURE PATH CHECK
         file_path = resolve_and_check_path(path)
         
         if not file_path.exists() or file_path.is_dir():
             return None
             
-        mime = magic.Magic(mime=True)
-        file_type = mime.from_file(str(file_path))
+        file_type = _MIME.from_file(str(file_path))
         
         if file_type.startswith('image/'):
-            img = PILImage.open(str(file_path))
-            img.thumbnail((300, 300))  # Create thumbnail
+            with PILImage.open(str(file_path)) as img:
+                # Let the JPEG decoder downscale while decoding (no-op for other formats)
+                img.draft('RGB', PREVIEW_SIZE)
+                img.thumbnail(PREVIEW_SIZE, PILImage.Resampling.LANCZOS)  # Create thumbnail
+                thumb = img
+                if thumb.mode not in PNG_MODES:
+                    # CMYK, YCbCr, F, ...: convert to something PNG/JPEG can store
+                    thumb = thumb.convert('RGBA' if 'A' in thumb.getbands() else 'RGB')
+                # Return an encoded image; raw tobytes() pixels aren't a usable file
+                fmt = 'JPEG' if thumb.mode in ('RGB', 'L') else 'PNG'
+                buf = BytesIO()
+                thumb.save(buf, format=fmt, quality=80, optimize=True)
             # The return is now inside the secure check and using the safe path
-            return Image(data=img.tobytes(), format=img.format.lower())
-    except ImportError:
-        # If magic or PIL is not installed
-        return None
+            return Image(data=buf.getvalue(), format=fmt.lower())
     except PermissionError:
         # Handle access denied gracefully by returning None for a preview
         return None
@@ -7,19 +7,46 @@ SECURITY NOTICE (for local use only):
 - CORS is intentionally open for localhost convenience
 - No authentication/authorization is implemented
 - If you ever deploy this beyond localhost, implement:
-  1. CORS restrictions (see TODO comments)
+  1. CORS restrictions (see the TODO on CORS_ALLOW_ORIGIN)
   2. Authentication/authorization
   3. Rate limiting
   4. Security logging
 """
 
 import http.server
-import socketserver
+from http.server import ThreadingHTTPServer
+from http import HTTPStatus
+from functools import lru_cache
 import json
 import requests
+from requests.adapters import HTTPAdapter
 import os
 import sys
 import subprocess
+import signal
+import time
+import threading
+import queue
+import errno
+import mmap
+from pathlib import Path
+from urllib.parse import urlsplit, parse_qs, unquote
+
+# orjson is optional: it parses/encodes the per-token JSON several times faster,
+# but the stdlib json module is used when it isn't installed.
+try:
+    import orjson
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps
+except ImportError:
+    def _json_loads(data):
+        # Unlike orjson, json.loads() doesn't accept memoryviews (pooled body buffers)
+        if isinstance(data, memoryview):
+            data = bytes(data)
+        return json.loads(data)
+
+    def _json_dumps(obj):
+        return json.dumps(obj).encode('utf-8')
 
 LLAMA_CPP_API_URL = "http://localhost:8080/v1/chat/completions"
 PORT = 8081
@@ -27,15 +54,248 @@ PORT = 8081
 # Global reference to the server instance
 server_instance = None
 
+# PID of the llama-server process to stop on shutdown, if whoever started it
+# recorded one. Without it, Windows falls back to taskkill by image name.
+LLAMA_SERVER_PID = os.environ.get("LLAMA_SERVER_PID")
+
+# Taken (and never released) by the first shutdown request; with a threaded
+# server several can arrive at once
+SHUTDOWN_LOCK = threading.Lock()
+
+# /model_info responses are reused for this long; the loaded model only changes
+# when llama-server is restarted
+MODEL_INFO_TTL_SECONDS = 30.0
+MODEL_INFO_LOCK = threading.Lock()
+_MODEL_INFO_CACHE = {"ts": float("-inf"), "body": None}
+
+# Shared session so connections to llama.cpp are reused (keep-alive) instead of
+# opening a fresh TCP connection for every request. Retries are disabled: a
+# replayed generation request would start a second completion upstream.
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=32, pool_maxsize=32, max_retries=0))
+
 # Safe root directory for saving files (relative to this script's location)
 # This ensures the path is consistent regardless of where the script is run from
 SAFE_SAVE_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "saved_files"))
 
+# Resolved once at startup; save targets are resolved too (following symlinks)
+# and must land strictly inside it
+SAFE_SAVE_ROOT_PATH = Path(SAFE_SAVE_ROOT).resolve()
+
+# Directories already created under SAFE_SAVE_ROOT, so repeated saves into the
+# same folder skip os.makedirs()
+_CREATED_DIRS = set()
+
 # Maximum file size allowed (10MB) - prevents disk exhaustion attacks
 MAX_FILE_SIZE_BYTES = 10 * 1024 * 1024  # 10MB
 
+# Requests declaring a larger body are refused with 413 before any of it is
+# read, so a single Content-Length header can't make the bridge allocate memory
+MAX_BODY_BYTES = int(os.environ.get("DRAFTER_MAX_BODY_BYTES", 32 * 1024 * 1024))  # 32MB
+
+# How much of a refused body is read and discarded, so the client isn't reset
+# before it gets to read the 413 response
+REFUSED_BODY_DRAIN_BYTES = 1 << 20  # 1MB
+
+# Saves larger than this bypass the page cache with O_DIRECT where supported
+# (Linux): the file is written once and not read back, so caching it only
+# evicts more useful pages. O_DIRECT needs block-aligned buffers and lengths.
+DIRECT_IO_THRESHOLD = 1 << 20  # 1MB
+DIRECT_IO_ALIGN = 4096
+
+# JSON request bodies are read into reusable buffers instead of a fresh bytes
+# object per request. Buffers grown past the pooling limit are dropped after use.
+BODY_BUFFER_SIZE = 256 * 1024  # 256KB
+BODY_BUFFER_MAX_POOLED = 2 * 1024 * 1024  # 2MB
+_BODY_BUFFERS = queue.SimpleQueue()
+
+# Raw saves (X-Save-Raw: 1) copy the request body to disk in chunks of this size
+SAVE_CHUNK_BYTES = 1 << 16  # 64KB
+
+# Streamed tokens that arrived in the same upstream network chunk are batched
+# into one socket write, flushed when the chunk is used up (so nothing waits for
+# later data) or earlier once this many bytes are pending
+STREAM_FLUSH_BYTES = 8192
+
+# Response header values shared by every handler.
+# TODO: Restrict CORS if ever deployed beyond localhost (use 'http://localhost' instead of '*')
+CORS_ALLOW_ORIGIN = '*'
+CONTENT_TYPE_JSON = 'application/json'
+
+# Responses are written as one pre-assembled block instead of via
+# send_response()/send_header() per request. HTTP/1.0 matches the handler's
+# default protocol_version: a streamed body is delimited by closing the connection.
+RESPONSE_HEADERS = (
+    b'Content-Type: ' + CONTENT_TYPE_JSON.encode('ascii') + b'\r\n'
+    b'Access-Control-Allow-Origin: ' + CORS_ALLOW_ORIGIN.encode('ascii') + b'\r\n'
+)
+PREFLIGHT_HEADERS = (
+    b'Access-Control-Allow-Methods: POST, OPTIONS\r\n'
+    b'Access-Control-Allow-Headers: X-Requested-With, Content-Type, X-Save-Raw, X-Output-Path\r\n'
+)
+
+@lru_cache(maxsize=None)
+def _status_line(code):
+    return b'HTTP/1.0 %d %s\r\n' % (code, HTTPStatus(code).phrase.encode('ascii'))
+
+STREAM_PREAMBLE = _status_line(200) + RESPONSE_HEADERS + b'\r\n'
+
+# Error responses are {"error": <message>}, assembled around the encoded message
+ERROR_BODY_PREFIX = b'{"error":'
+ERROR_BODY_SUFFIX = b'}'
+
+# SSE framing of the upstream llama.cpp stream
+SSE_DATA_PREFIX = b'data:'
+SSE_DATA_PREFIX_LEN = len(SSE_DATA_PREFIX)
+SSE_DONE = b'[DONE]'
+SSE_CR, SSE_COLON, SSE_SPACE = b'\r: '
+
+# Fast path for the delta content of a streamed chunk (see _scan_delta_content)
+DELTA_CONTENT_KEY = b'"content":"'
+DELTA_CONTENT_KEY_LEN = len(DELTA_CONTENT_KEY)
+GUI_RESPONSE_PREFIX = b'{"response":"'
+GUI_RESPONSE_SUFFIX = b'"}\n'
+
+# The same line around an already JSON-encoded (quoted) string
+GUI_RESPONSE_KEY = b'{"response":'
+GUI_RESPONSE_END = b'}\n'
+
+def _iter_sse_data(chunks):
+    """
+    Yield the payload of each `data:` field in an OpenAI-style SSE stream,
+    stopping at the terminating [DONE] event. Comment/keep-alive lines
+    (starting with ':') and other SSE fields are skipped. None is yielded
+    after each network chunk has been consumed, marking a point to flush.
+
+    Lines are located with bytes.find() and checked in place using start/end
+    offsets into the buffer, so the only per-line copy is the yielded payload.
+
+    chunks is an iterator owned by the caller, so it can keep reading past
+    [DONE]: closing a half-consumed requests iterator drops the connection.
+    """
+    buf = b''
+    for data in chunks:
+        buf = buf + data if buf else data
+        pos = 0
+        while (nl := buf.find(b'\n', pos)) != -1:
+            start, end = pos, nl
+            pos = nl + 1
+            # CRLF line endings are allowed by the SSE spec
+            if end > start and buf[end - 1] == SSE_CR:
+                end -= 1
+            # Event separators and keep-alive comments are the common non-data lines
+            if start == end or buf[start] == SSE_COLON:
+                continue
+            if not buf.startswith(SSE_DATA_PREFIX, start, end):
+                continue
+            # The SSE spec allows (but doesn't require) one space after the colon
+            start += SSE_DATA_PREFIX_LEN
+            if start < end and buf[start] == SSE_SPACE:
+                start += 1
+            # A JSON payload can never start with "[DONE]", so no strip() is needed
+            if buf.startswith(SSE_DONE, start, end):
+                return
+            if start < end:
+                yield buf[start:end]
+        # Keep only the incomplete last line for the next chunk
+        buf = buf[pos:]
+        yield None
+
+def _acquire_body_buffer(size):
+    """Take a pooled buffer of at least size bytes, allocating one if needed."""
+    try:
+        buf = _BODY_BUFFERS.get_nowait()
+    except queue.Empty:
+        buf = bytearray(BODY_BUFFER_SIZE)
+    if len(buf) < size:
+        buf = bytearray(size)
+    return buf
+
+def _release_body_buffer(buf):
+    if len(buf) <= BODY_BUFFER_MAX_POOLED:
+        _BODY_BUFFERS.put(buf)
+
+def _ensure_save_dir(directory):
+    if directory not in _CREATED_DIRS:
+        os.makedirs(directory, exist_ok=True)
+        _CREATED_DIRS.add(directory)
+
+def _open_save_file(path):
+    """Open path for writing (created/truncated, binary) and return the descriptor."""
+    flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0)
+    try:
+        return os.open(path, flags, 0o644)
+    except FileNotFoundError:
+        # The directory was remembered as created but has since been removed
+        directory = os.path.dirname(path)
+        _CREATED_DIRS.discard(directory)
+        _ensure_save_dir(directory)
+        return os.open(path, flags, 0o644)
+
+def _write_direct(path, data):
+    """
+    Write data to path with O_DIRECT. Returns False, having written nothing
+    useful, if the platform or filesystem doesn't support it (e.g. tmpfs);
+    the caller then does a normal buffered write.
+    """
+    if not hasattr(os, 'O_DIRECT'):
+        return False
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_DIRECT, 0o644)
+    except OSError as e:
+        if e.errno in (errno.EINVAL, errno.ENOENT):
+            return False
+        raise
+    try:
+        # Anonymous mmap memory is page-aligned; pad the write to a whole number
+        # of blocks and cut the file back to the real length afterwards
+        aligned_len = -(-len(data) // DIRECT_IO_ALIGN) * DIRECT_IO_ALIGN
+        with mmap.mmap(-1, aligned_len) as buf:
+            buf[:len(data)] = data
+            # Write from the mmap itself: no memoryview slice may outlive a failed
+            # write, or closing the mmap raises BufferError over the OSError
+            written = os.write(fd, buf)
+        if written != aligned_len:
+            # Rare short write; the remainder couldn't be sent aligned, so let
+            # the buffered path rewrite the file
+            return False
+        os.ftruncate(fd, len(data))
+    except OSError as e:
+        if e.errno != errno.EINVAL:
+            raise
+        return False
+    finally:
+        os.close(fd)
+    return True
+
+def _write_all(fd, data):
+    """Write all of data to fd, looping over short writes."""
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view):]
+
+def _scan_delta_content(payload):
+    """
+    Pull the raw `"content":"..."` string out of a chunk payload without
+    parsing it. Returns the bytes between the quotes, which are already valid
+    JSON string contents, or None when the payload needs a real JSON parse
+    (no such key, a spaced/null value, or escape sequences in the string).
+    """
+    start = payload.find(DELTA_CONTENT_KEY)
+    if start == -1:
+        return None
+    start += DELTA_CONTENT_KEY_LEN
+    end = payload.find(b'"', start)
+    # A backslash before the closing quote may be escaping it; let the parser decide
+    if end == -1 or payload.find(b'\\', start, end) != -1:
+        return None
+    return payload[start:end]
+
 class DrafterBridgeServer(http.server.BaseHTTPRequestHandler):
-    
+    # TCP_NODELAY: the streaming loop already batches its writes, so Nagle's
+    # algorithm would only delay the last partial batch of a generation
+    disable_nagle_algorithm = True
+
     def do_GET(self):
         """Handle GET requests for model information"""
         if self.path == '/model_info':
@@ -45,9 +305,24 @@ class DrafterBridgeServer(http.server.BaseHTTPRequestHandler):
     
     def do_POST(self):
         try:
-            content_length = int(self.headers['Content-Length'])
-            post_data = self.rfile.read(content_length)
-            data = json.loads(post_data)
+            content_length = int(self.headers.get('Content-Length', 0))
+            if content_length < 0:
+                raise ValueError(content_length)
+        except ValueError:
+            self._send_error("Invalid Content-Length header.", 400)
+            return
+
+        try:
+            if content_length > MAX_BODY_BYTES:
+                self._refuse_oversized_body(content_length)
+                return
+
+            # Raw saves carry the file itself as the body, so skip JSON entirely
+            if self.headers.get('X-Save-Raw') == '1':
+                self._handle_raw_save_request(content_length)
+                return
+
+            data = self._read_json_body(content_length)
 
             # Check if this is a shutdown, save, or generation request
             if 'shutdown' in data:
@@ -61,61 +336,109 @@ class DrafterBridgeServer(http.server.BaseHTTPRequestHandler):
             self._send_error(f"Invalid JSON request: {e}", 400)
             return
 
+    def _refuse_oversized_body(self, content_length):
+        self.close_connection = True
+        self._send_error(
+            f"Request body too large: {content_length} bytes exceeds the limit of {MAX_BODY_BYTES} bytes",
+            413
+        )
+        # Drain a bounded amount in fixed-size reads; the rest is dropped with the connection
+        remaining = min(content_length, REFUSED_BODY_DRAIN_BYTES)
+        while remaining > 0:
+            chunk = self.rfile.read(min(remaining, SAVE_CHUNK_BYTES))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+
+    def _read_json_body(self, content_length):
+        """Read the request body into a pooled buffer and parse it as JSON"""
+        buf = _acquire_body_buffer(content_length)
+        view = memoryview(buf)
+        try:
+            received = 0
+            while received < content_length:
+                n = self.rfile.readinto(view[received:content_length])
+                if not n:
+                    break
+                received += n
+            # The parsed objects don't reference the buffer, so it can be reused
+            return _json_loads(view[:received])
+        finally:
+            view.release()
+            _release_body_buffer(buf)
+
     # Function to handle model info request
     def _handle_model_info_request(self):
         """Fetch and return model information from llama.cpp"""
         try:
-            # Query the llama.cpp server for model info
-            response = requests.get("http://localhost:8080/v1/models")
-            response.raise_for_status()
-            
-            model_data = response.json()
-            # Extract model name from the response
-            model_name = "Unknown"
-            if 'data' in model_data and len(model_data['data']) > 0:
-                model_id = model_data['data'][0].get('id', 'Unknown')
-                # Clean up the model name (remove path if present, works on both Windows and Unix)
-                model_name = os.path.basename(model_id)
-                # Remove .gguf extension if present
-                if model_name.endswith('.gguf'):
-                    model_name = model_name[:-5]
-            
-            self.send_response(200)
-            self.send_header('Content-Type', 'application/json')
-            # TODO: Restrict CORS if ever deployed beyond localhost (use 'http://localhost' instead of '*')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            response_data = json.dumps({'model_name': model_name})
-            self.wfile.write(response_data.encode('utf-8'))
+            # The GUI polls this; serve the encoded response from cache while fresh
+            with MODEL_INFO_LOCK:
+                if time.monotonic() - _MODEL_INFO_CACHE["ts"] < MODEL_INFO_TTL_SECONDS:
+                    body = _MODEL_INFO_CACHE["body"]
+                else:
+                    body = None
+
+            if body is None:
+                body = self._fetch_model_info_body()
+                # The lock isn't held during the upstream call, so a slow llama.cpp
+                # can't stall other requests; concurrent misses just store the same value
+                with MODEL_INFO_LOCK:
+                    _MODEL_INFO_CACHE["body"] = body
+                    _MODEL_INFO_CACHE["ts"] = time.monotonic()
+
+            self._send_oneshot(200, body)
             
         except requests.exceptions.RequestException as e:
             self._send_error(f"Could not fetch model info from llama.cpp: {e}", 503)
         except Exception as e:
             self._send_error(f"Error retrieving model info: {e}", 500)
 
+    def _fetch_model_info_body(self):
+        """Query llama.cpp for the loaded model and return the encoded JSON response body"""
+        # Query the llama.cpp server for model info
+        with SESSION.get("http://localhost:8080/v1/models") as response:
+            response.raise_for_status()
+            model_data = _json_loads(response.content)
+
+        # Extract model name from the response
+        model_name = "Unknown"
+        if 'data' in model_data and len(model_data['data']) > 0:
+            model_id = model_data['data'][0].get('id', 'Unknown')
+            # Clean up the model name (remove path if present, works on both Windows and Unix)
+            model_name = os.path.basename(model_id)
+            # Remove .gguf extension if present
+            if model_name.endswith('.gguf'):
+                model_name = model_name[:-5]
+
+        return _json_dumps({'model_name': model_name})
+
     # Function to handle shutdown request
     def _handle_shutdown_request(self):
         try:
-            self.send_response(200)
-            self.send_header('Content-Type', 'application/json')
-            # TODO: Restrict CORS if ever deployed beyond localhost
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            response = json.dumps({'message': 'Shutting down servers...'})
-            self.wfile.write(response.encode('utf-8'))
+            self._send_oneshot(200, _json_dumps({'message': 'Shutting down servers...'}))
+
+            # Only the first request kills llama-server and schedules the exit
+            if not SHUTDOWN_LOCK.acquire(blocking=False):
+                return
             
-            # Kill llama-server.exe
+            # Kill llama-server
             try:
-                subprocess.run(['taskkill', '/IM', 'llama-server.exe', '/F'], 
-                             capture_output=True, check=False)
-                print("Terminated llama-server.exe")
+                if LLAMA_SERVER_PID:
+                    # Signal the recorded process directly; on Windows os.kill()
+                    # calls TerminateProcess, so no taskkill process is spawned
+                    os.kill(int(LLAMA_SERVER_PID), signal.SIGTERM)
+                    print(f"Terminated llama-server (PID {LLAMA_SERVER_PID})")
+                elif os.name == 'nt':
+                    subprocess.run(['taskkill', '/IM', 'llama-server.exe', '/F'], 
+                                 capture_output=True, check=False)
+                    print("Terminated llama-server.exe")
+                else:
+                    print("LLAMA_SERVER_PID is not set; leaving llama-server running")
             except Exception as e:
                 print(f"Error terminating llama-server: {e}")
             
             # Schedule this server to shut down
-            import threading
             def shutdown_self():
-                import time
                 time.sleep(1)  # Give time for response to be sent
                 print("Shutting down bridge server...")
                 
@@ -141,44 +464,112 @@ class DrafterBridgeServer(http.server.BaseHTTPRequestHandler):
             self._send_error("Missing 'save_content' or 'output_path' for save request.", 400)
             return
         
-        # Check file size limit to prevent disk exhaustion
-        content_size = len(content.encode('utf-8'))
-        if content_size > MAX_FILE_SIZE_BYTES:
-            self._send_error(
-                f"Content too large: {content_size} bytes exceeds maximum allowed size of {MAX_FILE_SIZE_BYTES} bytes ({MAX_FILE_SIZE_BYTES // (1024*1024)}MB)",
-                400
-            )
+        # Encode once; the same bytes are size-checked and written
+        try:
+            encoded = content.encode('utf-8')
+        except (UnicodeEncodeError, AttributeError):
+            # Lone surrogates (accepted by the stdlib json fallback) or a non-string
+            self._send_error("'save_content' must be a valid Unicode string.", 400)
+            return
+        if not self._check_save_size(len(encoded)):
             return
         
         try:
-            # Construct full save path
-            full_output_path = os.path.abspath(os.path.join(SAFE_SAVE_ROOT, output_path))
-            # Ensure the resulting path is under SAFE_SAVE_ROOT
-            if not full_output_path.startswith(SAFE_SAVE_ROOT + os.sep):
-                self._send_error("Invalid path: writing outside of SAFE_SAVE_ROOT is not allowed.", 400)
+            full_output_path = self._prepare_save_path(output_path)
+            if full_output_path is None:
                 return
-
-            output_dir = os.path.dirname(full_output_path)
-            if output_dir:
-                os.makedirs(output_dir, exist_ok=True)
             
-            # Write the final content to the file (safe path)
-            with open(full_output_path, 'w', encoding='utf-8') as outfile:
-                outfile.write(content)
+            # Write the final content to the file (safe path). Binary mode, so
+            # line endings are saved exactly as the GUI sent them.
+            if len(encoded) <= DIRECT_IO_THRESHOLD or not _write_direct(full_output_path, encoded):
+                fd = _open_save_file(full_output_path)
+                try:
+                    _write_all(fd, encoded)
+                finally:
+                    os.close(fd)
             
-            self.send_response(200)
-            self.send_header('Content-Type', 'application/json')
-            # TODO: Restrict CORS if ever deployed beyond localhost
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            response = json.dumps({'message': f'Successfully saved to {full_output_path}'})
-            self.wfile.write(response.encode('utf-8'))
+            self._send_save_success(full_output_path)
+
+        except IOError as e:
+            self._send_error(f"Could not write to file: {e}", 500)
+        except Exception as e:
+            self._send_error(f"An unexpected server error occurred: {e}", 500)
+
+    def _handle_raw_save_request(self, content_length):
+        """
+        Save the request body as-is, without JSON or str round trips. The
+        target comes from the X-Output-Path header (percent-encoded, as header
+        values can't carry arbitrary Unicode).
+        """
+        output_path = unquote(self.headers.get('X-Output-Path', ''))
+
+        if content_length <= 0 or not output_path:
+            self._send_error("Missing body or 'X-Output-Path' header for raw save request.", 400)
+            return
+
+        if not self._check_save_size(content_length):
+            return
+
+        try:
+            full_output_path = self._prepare_save_path(output_path)
+            if full_output_path is None:
+                return
+
+            fd = _open_save_file(full_output_path)
+            try:
+                remaining = content_length
+                while remaining > 0:
+                    chunk = self.rfile.read(min(remaining, SAVE_CHUNK_BYTES))
+                    if not chunk:
+                        break
+                    _write_all(fd, chunk)
+                    remaining -= len(chunk)
+            finally:
+                os.close(fd)
+
+            if remaining:
+                self._send_error(
+                    f"Request body ended after {content_length - remaining} of {content_length} bytes; "
+                    f"{full_output_path} is incomplete.",
+                    400
+                )
+                return
+
+            self._send_save_success(full_output_path)
 
         except IOError as e:
             self._send_error(f"Could not write to file: {e}", 500)
         except Exception as e:
             self._send_error(f"An unexpected server error occurred: {e}", 500)
 
+    def _check_save_size(self, content_size):
+        """Check file size limit to prevent disk exhaustion; sends the 400 if exceeded"""
+        if content_size > MAX_FILE_SIZE_BYTES:
+            self._send_error(
+                f"Content too large: {content_size} bytes exceeds maximum allowed size of {MAX_FILE_SIZE_BYTES} bytes ({MAX_FILE_SIZE_BYTES // (1024*1024)}MB)",
+                400
+            )
+            return False
+        return True
+
+    def _prepare_save_path(self, output_path):
+        """
+        Resolve output_path under SAFE_SAVE_ROOT and create its parent
+        directory. Returns the full path, or None after sending a 400.
+        """
+        # Construct full save path
+        full_output_path = (SAFE_SAVE_ROOT_PATH / output_path).resolve()
+        # Ensure the resulting path is under SAFE_SAVE_ROOT (and isn't the root itself)
+        if full_output_path == SAFE_SAVE_ROOT_PATH or not full_output_path.is_relative_to(SAFE_SAVE_ROOT_PATH):
+            self._send_error("Invalid path: writing outside of SAFE_SAVE_ROOT is not allowed.", 400)
+            return None
+
+        _ensure_save_dir(str(full_output_path.parent))
+        return str(full_output_path)
+
+    def _send_save_success(self, full_output_path):
+        self._send_oneshot(200, _json_dumps({'message': f'Successfully saved to {full_output_path}'}))
+
     # MODIFIED: This function now only handles generation and streaming
     def _handle_generation_request(self, data):
         conversation_history = data.get('conversation_history', [])
@@ -186,64 +577,98 @@ class DrafterBridgeServer(http.server.BaseHTTPRequestHandler):
             self._send_error("Missing 'conversation_history' for generation request.", 400)
             return
         
-        self._stream_to_llama_cpp(conversation_history)
+        # ?passthrough=1 forwards each upstream chunk's JSON as-is (one per line)
+        # instead of re-wrapping its delta content as {"response": ...}
+        query = parse_qs(urlsplit(self.path).query)
+        passthrough = query.get('passthrough', [''])[0] == '1'
+
+        self._stream_to_llama_cpp(conversation_history, passthrough)
 
     # MODIFIED: This function no longer writes to a file
-    def _stream_to_llama_cpp(self, conversation_history):
+    def _stream_to_llama_cpp(self, conversation_history, passthrough=False):
         try:
             llama_cpp_payload = {
                 "messages": conversation_history,
                 "stream": True
             }
 
-            response = requests.post(LLAMA_CPP_API_URL, json=llama_cpp_payload, stream=True)
-            response.raise_for_status()
+            # Closing the response releases its socket even if the client went away
+            with SESSION.post(LLAMA_CPP_API_URL, json=llama_cpp_payload, stream=True) as response:
+                response.raise_for_status()
 
-            self.send_response(200)
-            self.send_header('Content-Type', 'application/json')
-            # TODO: Restrict CORS if ever deployed beyond localhost
-            self.send_header('Access-Control-Allow-Origin', '*') 
-            self.end_headers()
+                self.log_request(200)
+                self.wfile.write(STREAM_PREAMBLE)
 
-            for line in response.iter_lines():
-                if line.startswith(b'data: '):
-                    line = line[len(b'data: '):]
-                    if line.strip() == b'[DONE]':
-                        break
-                    if line:
-                        try:
-                            chunk = json.loads(line)
-                            content = chunk.get('choices', [{}])[0].get('delta', {}).get('content', '')
-                            if content:
-                                # REMOVED: outfile.write(content)
-                                gui_response = json.dumps({"response": content})
-                                self.wfile.write(gui_response.encode('utf-8') + b'\n')
-                                self.wfile.flush()
-                        except (json.JSONDecodeError, IndexError):
-                            print(f"Warning: Could not decode JSON line: {line}")
+                # chunk_size=None hands over each chunk as soon as it arrives
+                # (llama.cpp streams with chunked transfer encoding)
+                chunks = response.iter_content(chunk_size=None)
+                pending = bytearray()
+                try:
+                    for payload in _iter_sse_data(chunks):
+                        if payload is None:
+                            # Everything that arrived together is converted; send it
+                            # now rather than holding it until more data shows up
+                            if pending:
+                                self.wfile.write(pending)
+                                pending.clear()
+                            continue
+
+                        if passthrough:
+                            pending += payload + b'\n'
+                        elif (raw_content := _scan_delta_content(payload)) is not None:
+                            # Plain content: forward the bytes as-is, no decode/encode
+                            if raw_content:
+                                pending += GUI_RESPONSE_PREFIX + raw_content + GUI_RESPONSE_SUFFIX
+                        else:
+                            try:
+                                chunk = _json_loads(payload)
+                                content = chunk.get('choices', [{}])[0].get('delta', {}).get('content', '')
+                                if content:
+                                    # Encode just the string; the fixed wrapper needs no dict
+                                    pending += GUI_RESPONSE_KEY + _json_dumps(content) + GUI_RESPONSE_END
+                            # orjson.JSONDecodeError subclasses json.JSONDecodeError
+                            except (json.JSONDecodeError, IndexError):
+                                print(f"Warning: Could not decode JSON line: {payload}")
+
+                        if len(pending) >= STREAM_FLUSH_BYTES:
+                            self.wfile.write(pending)
+                            pending.clear()
+                finally:
+                    # Whatever is still buffered goes out when the stream ends
+                    if pending:
+                        self.wfile.write(pending)
+
+                # _iter_sse_data stops at [DONE]; read the rest of the body (the
+                # final empty chunk) from the same iterator so close() returns
+                # the connection to the pool instead of discarding it
+                for _ in chunks:
+                    pass
 
         except requests.exceptions.RequestException as e:
             self._send_error(f"Could not connect to llama.cpp at {LLAMA_CPP_API_URL}: {e}", 503)
 
     def _send_error(self, message, code):
-        self.send_response(code)
-        self.send_header('Content-Type', 'application/json')
-        # TODO: Restrict CORS if ever deployed beyond localhost
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.end_headers()
-        error_response = json.dumps({'error': message})
-        self.wfile.write(error_response.encode('utf-8'))
+        # Fixed {"error": ...} shape: only the message itself needs encoding
+        self._send_oneshot(code, ERROR_BODY_PREFIX + _json_dumps(message) + ERROR_BODY_SUFFIX)
+
+    def _send_oneshot(self, code, body, extra_headers=b''):
+        """Send a complete response (status line, headers, body) in a single write"""
+        self.log_request(code)
+        self.wfile.write(b''.join((
+            _status_line(code),
+            RESPONSE_HEADERS,
+            extra_headers,
+            b'Content-Length: %d\r\n\r\n' % len(body),
+            body,
+        )))
 
     def do_OPTIONS(self):
-        self.send_response(200, "ok")
-        # TODO: Restrict CORS if ever deployed beyond localhost
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'POST, OPTIONS')
-        self.send_header("Access-Control-Allow-Headers", "X-Requested-With, Content-Type")
-        self.end_headers()
+        self._send_oneshot(200, b'', PREFLIGHT_HEADERS)
 
 if __name__ == "__main__":
-    httpd = socketserver.TCPServer(("", PORT), DrafterBridgeServer)
+    # Threaded server so a long streaming generation doesn't block /model_info,
+    # save or shutdown requests (handler threads are daemonic)
+    httpd = ThreadingHTTPServer(("", PORT), DrafterBridgeServer)
     server_instance = httpd
     print(f"🚀 Astral Drafter BRIDGE server starting on http://localhost:{PORT}")
     print(f"Ready to forward requests to llama.cpp at {LLAMA_CPP_API_URL}")